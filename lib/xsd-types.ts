@@ -124,5 +124,6 @@ export interface XsdIndex {
   summary: XsdIndexSummary;
   warnings: IndexWarning[];
   schemas: SchemaSummary[];
+  labelPathIndex?: Record<string, string[]>;
   components: ComponentSummary[];
 }
@@ -8,17 +8,41 @@ JSON document that powers the read-only schema explorer UI.
 from __future__ import annotations
 
 import argparse
+import contextlib
 import dataclasses
+import functools
+import gzip
+import hashlib
 import json
+import mmap
+import os
+import pickle
 import re
-import xml.etree.ElementTree as ET
+import shutil
+import sys
 from collections import defaultdict
 from datetime import datetime, timezone
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from lxml import etree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 XS_NS = "http://www.w3.org/2001/XMLSchema"
 XS_TAG = f"{{{XS_NS}}}"
+XS_ANNOTATION = f"{XS_TAG}annotation"
+XS_DOCUMENTATION = f"{XS_TAG}documentation"
+XS_ELEMENT = f"{XS_TAG}element"
+XS_ATTRIBUTE = f"{XS_TAG}attribute"
+XS_ATTRIBUTE_GROUP = f"{XS_TAG}attributeGroup"
+XS_SIMPLE_TYPE = f"{XS_TAG}simpleType"
+XS_RESTRICTION = f"{XS_TAG}restriction"
+XS_ENUMERATION = f"{XS_TAG}enumeration"
 BUILTIN_NS = XS_NS
 GLOBAL_KINDS = {
     "element",
@@ -40,26 +64,90 @@ FACET_NAMES = [
     "minExclusive",
     "maxExclusive",
 ]
+XS_FACETS = {name: f"{XS_TAG}{name}" for name in FACET_NAMES}
+CONTAINER_TAGS = frozenset(
+    f"{XS_TAG}{tag}"
+    for tag in (
+        "sequence",
+        "choice",
+        "all",
+        "group",
+        "complexType",
+        "complexContent",
+        "simpleContent",
+        "extension",
+        "restriction",
+    )
+)
+WHITESPACE_RE = re.compile(r"\s+")
+SLUG_INVALID_RE = re.compile(r"[^a-z0-9._-]+")
+SLUG_DASHES_RE = re.compile(r"-{2,}")
+REFERENCE_ATTRS = ("type", "base", "ref", "itemType", "memberTypes", "substitutionGroup")
+REFERENCE_ATTR_NAMES = frozenset(REFERENCE_ATTRS)
+REFERENCE_EXPECTED_KINDS: Dict[str, Tuple[str, ...]] = {
+    "type": ("complexType", "simpleType"),
+    "base": ("complexType", "simpleType"),
+    "itemType": ("simpleType",),
+    "memberTypes": ("simpleType",),
+    "substitutionGroup": ("element",),
+}
+REF_EXPECTED_KINDS = {kind: (kind,) for kind in ("element", "attribute", "group", "attributeGroup")}
+# Shared by every node without a restriction; treat both as read-only.
+EMPTY_RESTRICTION: Dict[str, object] = {"base": "", "enumerations": (), "facets": {}}
+EMPTY_RESTRICTION_JSON: Dict[str, object] = {"base": "", "enumerations": [], "facets": {}}
+LOCAL_NAME_CACHE: Dict[str, str] = {}
+TOP_LEVEL_TAGS = tuple(f"{XS_TAG}{kind}" for kind in ("include", "import", *sorted(GLOBAL_KINDS)))
+XS_NAMESPACES = {"xs": XS_NS}
+INLINE_BASE_XPATH = ET.XPath(
+    " | ".join(
+        [
+            "./xs:complexType/xs:complexContent/xs:extension/@base",
+            "./xs:complexType/xs:complexContent/xs:restriction/@base",
+            "./xs:complexType/xs:simpleContent/xs:extension/@base",
+            "./xs:complexType/xs:simpleContent/xs:restriction/@base",
+        ]
+    ),
+    namespaces=XS_NAMESPACES,
+)
+ENUMERATION_VALUES_XPATH = ET.XPath("./xs:enumeration/@value", namespaces=XS_NAMESPACES)
+BASE_TYPE_XPATH = ET.XPath(
+    " | ".join(
+        [
+            "./xs:complexContent/xs:extension/@base",
+            "./xs:complexContent/xs:restriction/@base",
+            "./xs:simpleContent/xs:extension/@base",
+            "./xs:simpleContent/xs:restriction/@base",
+            "./xs:restriction/@base",
+            "./xs:simpleType/xs:restriction/@base",
+        ]
+    ),
+    namespaces=XS_NAMESPACES,
+)
+# Bump when the parse cache file layout changes. Cached parse results are
+# also tied to a digest of this script, so any edit to what parse_schema
+# or analyze_component produce invalidates them without a bump.
+CACHE_VERSION = 2
+# Components are written one at a time; a large buffer batches them into
+# few write calls instead of roughly one per component.
+WRITE_BUFFER_SIZE = 1 << 20
 
 
 def local_name(tag: str) -> str:
-    if "}" in tag:
-        return tag.rsplit("}", 1)[1]
-    return tag
-
-
-def xs(tag: str) -> str:
-    return f"{XS_TAG}{tag}"
+    try:
+        return LOCAL_NAME_CACHE[tag]
+    except KeyError:
+        name = LOCAL_NAME_CACHE[tag] = tag.rpartition("}")[2]
+        return name
 
 
 def clean_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip()
+    return WHITESPACE_RE.sub(" ", text or "").strip()
 
 
 def slugify(value: str) -> str:
     lowered = value.lower().strip()
-    lowered = re.sub(r"[^a-z0-9._-]+", "-", lowered)
-    lowered = re.sub(r"-{2,}", "-", lowered)
+    lowered = SLUG_INVALID_RE.sub("-", lowered)
+    lowered = SLUG_DASHES_RE.sub("-", lowered)
     return lowered.strip("-") or "item"
 
 
@@ -70,29 +158,23 @@ def parse_qname(raw: str) -> Tuple[Optional[str], str]:
     return None, raw
 
 
-def collect_nsmap(xsd_path: Path) -> Dict[str, str]:
-    nsmap: Dict[str, str] = {"xs": XS_NS, "xsd": XS_NS}
-    for _, value in ET.iterparse(xsd_path, events=("start-ns",)):
-        prefix, uri = value
-        nsmap[prefix or ""] = uri
-    return nsmap
-
-
-def text_from_doc_node(node: ET.Element) -> str:
+def text_from_doc_node(node: ET._Element) -> str:
+    if len(node) == 0:
+        return clean_text(node.text)
     return clean_text(" ".join(node.itertext()))
 
 
-def extract_documentation(node: ET.Element) -> List[str]:
+def extract_documentation(node: ET._Element) -> List[str]:
     docs: List[str] = []
-    for ann in node.findall(xs("annotation")):
-        for doc in ann.findall(xs("documentation")):
+    for ann in node.findall(XS_ANNOTATION):
+        for doc in ann.findall(XS_DOCUMENTATION):
             text = text_from_doc_node(doc)
             if text:
                 docs.append(text)
     return docs
 
 
-def occurrence_string(node: ET.Element) -> str:
+def occurrence_string(node: ET._Element) -> str:
     min_occurs = node.get("minOccurs", "1")
     max_occurs = node.get("maxOccurs", "1")
     if min_occurs == "1" and max_occurs == "1":
@@ -100,24 +182,20 @@ def occurrence_string(node: ET.Element) -> str:
     return f"{min_occurs}..{max_occurs}"
 
 
-def restrictions_from_node(node: ET.Element) -> Dict[str, object]:
-    restriction = node.find(xs("restriction"))
+def restrictions_from_node(node: ET._Element) -> Dict[str, object]:
+    restriction = node.find(XS_RESTRICTION)
     if restriction is None:
-        simple_type = node.find(xs("simpleType"))
+        simple_type = node.find(XS_SIMPLE_TYPE)
         if simple_type is not None:
-            restriction = simple_type.find(xs("restriction"))
+            restriction = simple_type.find(XS_RESTRICTION)
     if restriction is None:
-        return {"base": "", "enumerations": [], "facets": {}}
+        return EMPTY_RESTRICTION
 
-    base = restriction.get("base", "")
-    enums = [
-        enum.get("value", "")
-        for enum in restriction.findall(xs("enumeration"))
-        if enum.get("value") is not None
-    ]
+    base = sys.intern(restriction.get("base", ""))
+    enums = [str(value) for value in ENUMERATION_VALUES_XPATH(restriction)]
     facets: Dict[str, str] = {}
-    for facet in FACET_NAMES:
-        facet_node = restriction.find(xs(facet))
+    for facet, facet_tag in XS_FACETS.items():
+        facet_node = restriction.find(facet_tag)
         if facet_node is not None and facet_node.get("value") is not None:
             facets[facet] = facet_node.get("value", "")
 
@@ -146,6 +224,7 @@ class QNameResolution:
     target_ids: List[str]
     ambiguous: bool
     unresolved_reason: str
+    payload: Optional[Dict[str, object]] = dataclasses.field(default=None, compare=False, repr=False)
 
 
 @dataclasses.dataclass
@@ -153,7 +232,8 @@ class Reference:
     attr_name: str
     raw_value: str
     context: str
-    resolution: QNameResolution
+    expected_kinds: Optional[Tuple[str, ...]]
+    resolution: Optional[QNameResolution] = None
 
 
 @dataclasses.dataclass
@@ -165,8 +245,9 @@ class ElementField:
     occurrence: str
     documentation: str
     raw_type_or_ref: str
-    resolution: Optional[QNameResolution]
+    expected_kinds: Tuple[str, ...]
     restrictions: Dict[str, object]
+    resolution: Optional[QNameResolution] = None
 
 
 @dataclasses.dataclass
@@ -178,14 +259,15 @@ class AttributeField:
     use: str
     documentation: str
     raw_type_or_ref: str
-    resolution: Optional[QNameResolution]
+    expected_kinds: Tuple[str, ...]
     restrictions: Dict[str, object]
+    resolution: Optional[QNameResolution] = None
 
 
 @dataclasses.dataclass
 class BaseType:
     raw: str
-    resolution: Optional[QNameResolution]
+    resolution: Optional[QNameResolution] = None
 
 
 @dataclasses.dataclass
@@ -196,6 +278,16 @@ class InboundReference:
     context: str
 
 
+@dataclasses.dataclass
+class ComponentAnalysis:
+    restrictions: Dict[str, object]
+    enumerations: List[str]
+    base_type: Optional[BaseType]
+    element_fields: List[ElementField]
+    attribute_fields: List[AttributeField]
+    references: List[Reference]
+
+
 @dataclasses.dataclass
 class SchemaDoc:
     path: Path
@@ -212,15 +304,33 @@ class SchemaDoc:
         return self.path.stem
 
 
+@dataclasses.dataclass
+class ParseCache:
+    # sha256 hex digest -> pickled (SchemaDoc, analyses) for that content
+    entries: Dict[str, bytes] = dataclasses.field(default_factory=dict)
+    # schema path -> (mtime_ns, size, sha256) as of the last hash
+    digests: Dict[str, Tuple[int, int, str]] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class Catalog:
+    by_qname: Dict[Tuple[str, str], List["Component"]]
+    by_local_name: Dict[str, List["Component"]]
+    resolutions: Dict[Tuple[str, str, Optional[Tuple[str, ...]]], QNameResolution] = dataclasses.field(
+        default_factory=dict
+    )
+
+
 @dataclasses.dataclass
 class Component:
     schema: SchemaDoc
     kind: str
     name: str
-    node: ET.Element
+    node: Optional[ET._Element]
     namespace: str
     docs: List[str]
     id: str = ""
+    schema_file_name: str = ""
     restrictions: Dict[str, object] = dataclasses.field(default_factory=dict)
     enumerations: List[str] = dataclasses.field(default_factory=list)
     base_type: Optional[BaseType] = None
@@ -230,61 +340,106 @@ class Component:
     incoming: List[InboundReference] = dataclasses.field(default_factory=list)
 
 
-def parse_schema(xsd_path: Path) -> SchemaDoc:
-    tree = ET.parse(xsd_path)
-    root = tree.getroot()
-    if local_name(root.tag) != "schema":
-        raise ValueError(f"{xsd_path} is not an XSD schema")
+@functools.lru_cache(maxsize=None)
+def resolve_schema_location(parent: str, location: str) -> Tuple[str, bool]:
+    resolved = (Path(parent) / location).resolve()
+    return resolved.name, resolved.exists()
 
-    schema_id = f"schema-{slugify(xsd_path.stem)}"
-    nsmap = collect_nsmap(xsd_path)
-    target_namespace = root.get("targetNamespace", "")
 
-    dependencies: List[Dependency] = []
-    components: List[Component] = []
+@contextlib.contextmanager
+def open_mapped(path: Path) -> Iterator[Optional[mmap.mmap]]:
+    with path.open("rb") as handle:
+        try:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            view = None
+        if view is None:
+            yield None
+            return
+        with view:
+            yield view
 
-    for child in root:
-        child_kind = local_name(child.tag)
-
-        if child_kind in ("include", "import"):
-            location = (child.get("schemaLocation") or "").strip()
-            namespace = (child.get("namespace") or "").strip()
-            resolved_file_name = ""
-            exists = False
-            if location and "://" not in location:
-                resolved = (xsd_path.parent / location).resolve()
-                resolved_file_name = resolved.name
-                exists = resolved.exists()
-
-            dependencies.append(
-                Dependency(
-                    kind=child_kind,
-                    location=location,
-                    namespace=namespace,
-                    resolved_file_name=resolved_file_name,
-                    exists=exists,
-                )
-            )
-            continue
 
-        if child_kind not in GLOBAL_KINDS:
-            continue
+def file_digest(path: Path) -> str:
+    with open_mapped(path) as view:
+        return hashlib.sha256(b"" if view is None else view).hexdigest()
 
-        name = (child.get("name") or "").strip()
-        if not name:
-            continue
 
-        docs = extract_documentation(child)
-        components.append(
-            Component(
-                schema=None,  # set below
-                kind=child_kind,
-                name=name,
-                node=child,
-                namespace=target_namespace,
-                docs=docs,
+def parse_schema(xsd_path: Path) -> Tuple[SchemaDoc, List[ComponentAnalysis]]:
+    schema_id = f"schema-{slugify(xsd_path.stem)}"
+    schema_dir = str(xsd_path.parent)
+    nsmap: Dict[str, str] = {"xs": XS_NS, "xsd": XS_NS}
+    dependencies: List[Dependency] = []
+    components: List[Component] = []
+    analyses: List[ComponentAnalysis] = []
+
+    with open_mapped(xsd_path) as view:
+        try:
+            context = ET.iterparse(
+                view if view is not None else str(xsd_path),
+                events=("start-ns", "end"),
+                tag=TOP_LEVEL_TAGS,
+                remove_comments=True,
+                remove_pis=True,
             )
-        )
+            for event, value in context:
+                if event == "start-ns":
+                    prefix, uri = value
+                    nsmap[prefix or ""] = sys.intern(uri)
+                    continue
+
+                child = value
+                parent = child.getparent()
+                if parent is None or parent.getparent() is not None:
+                    continue
+                child_kind = local_name(child.tag)
+
+                if child_kind in ("include", "import"):
+                    location = (child.get("schemaLocation") or "").strip()
+                    namespace = (child.get("namespace") or "").strip()
+                    resolved_file_name = ""
+                    exists = False
+                    if location and "://" not in location:
+                        resolved_file_name, exists = resolve_schema_location(schema_dir, location)
+
+                    dependencies.append(
+                        Dependency(
+                            kind=child_kind,
+                            location=location,
+                            namespace=namespace,
+                            resolved_file_name=resolved_file_name,
+                            exists=exists,
+                        )
+                    )
+                else:
+                    name = (child.get("name") or "").strip()
+                    if name:
+                        component = Component(
+                            schema=None,  # set below
+                            kind=child_kind,
+                            name=name,
+                            node=child,
+                            namespace="",  # set below
+                            docs=extract_documentation(child),
+                        )
+                        # Analyze while the subtree is complete, then let it go
+                        # so only one top-level component is held in memory.
+                        analyses.append(analyze_component(component))
+                        component.node = None
+                        components.append(component)
+
+                child.clear()
+                while child.getprevious() is not None:
+                    del parent[0]
+        except ET.XMLSyntaxError as exc:
+            # Parsing from the mapping loses the file name in lxml's message.
+            raise ValueError(f"{xsd_path}: {exc}") from exc
+
+    root = context.root
+    if local_name(root.tag) != "schema":
+        raise ValueError(f"{xsd_path} is not an XSD schema")
+    target_namespace = sys.intern(root.get("targetNamespace", ""))
 
     schema = SchemaDoc(
         path=xsd_path,
@@ -298,8 +453,9 @@ def parse_schema(xsd_path: Path) -> SchemaDoc:
 
     for component in components:
         component.schema = schema
+        component.namespace = target_namespace
     schema.components = components
-    return schema
+    return schema, analyses
 
 
 def assign_component_ids(schemas: Sequence[SchemaDoc]) -> None:
@@ -309,72 +465,119 @@ def assign_component_ids(schemas: Sequence[SchemaDoc]) -> None:
             base = f"{schema.id}:{slugify(component.kind)}:{slugify(component.name)}"
             used[base] += 1
             component.id = f"{base}:{used[base]}"
+            component.schema_file_name = schema.file_name
 
 
-def build_catalog(
-    schemas: Sequence[SchemaDoc],
-) -> Dict[Tuple[str, str], List[Component]]:
+def build_catalog(schemas: Sequence[SchemaDoc]) -> Catalog:
     by_qname: Dict[Tuple[str, str], List[Component]] = defaultdict(list)
+    by_local_name: Dict[str, List[Component]] = defaultdict(list)
     for schema in schemas:
         for component in schema.components:
             by_qname[(component.namespace, component.name)].append(component)
-    return by_qname
+            by_local_name[component.name].append(component)
+    return Catalog(by_qname=dict(by_qname), by_local_name=dict(by_local_name))
 
 
 def compute_reachable_schemas(schemas: Sequence[SchemaDoc]) -> None:
-    by_file_name = {schema.file_name: schema for schema in schemas}
-    for schema in schemas:
-        visited: set[str] = set()
-        stack: List[str] = [schema.file_name]
+    index_by_file_name = {schema.file_name: index for index, schema in enumerate(schemas)}
+    adjacency = [
+        [
+            index_by_file_name[dep.resolved_file_name]
+            for dep in schema.dependencies
+            if dep.exists and dep.resolved_file_name in index_by_file_name
+        ]
+        for schema in schemas
+    ]
+
+    # Depth-first post-order puts dependencies before their dependents, so
+    # an acyclic include graph settles in one sweep. Include cycles need
+    # further sweeps until no closure changes.
+    order: List[int] = []
+    visited = [False] * len(schemas)
+    for start in range(len(schemas)):
+        if visited[start]:
+            continue
+        visited[start] = True
+        stack = [(start, iter(adjacency[start]))]
         while stack:
-            current = stack.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            schema_doc = by_file_name.get(current)
-            if not schema_doc:
-                continue
-            for dep in schema_doc.dependencies:
-                if dep.exists and dep.resolved_file_name in by_file_name:
-                    stack.append(dep.resolved_file_name)
-        schema.reachable_schema_files = visited
+            current, pending = stack[-1]
+            for dep_index in pending:
+                if not visited[dep_index]:
+                    visited[dep_index] = True
+                    stack.append((dep_index, iter(adjacency[dep_index])))
+                    break
+            else:
+                stack.pop()
+                order.append(current)
+
+    # Bit i of closure[k] is set when schemas[i] is reachable from schemas[k].
+    closure = [1 << index for index in range(len(schemas))]
+    changed = True
+    while changed:
+        changed = False
+        for index in order:
+            bits = closure[index]
+            for dep_index in adjacency[index]:
+                bits |= closure[dep_index]
+            if bits != closure[index]:
+                closure[index] = bits
+                changed = True
+
+    for schema, bits in zip(schemas, closure):
+        reachable: set[str] = set()
+        while bits:
+            lowest = bits & -bits
+            reachable.add(schemas[lowest.bit_length() - 1].file_name)
+            bits ^= lowest
+        schema.reachable_schema_files = reachable
 
 
 def resolve_qname(
     raw_qname: str,
     schema: SchemaDoc,
-    by_qname: Dict[Tuple[str, str], List[Component]],
+    catalog: Catalog,
+    expected_kinds: Optional[Sequence[str]] = None,
+) -> QNameResolution:
+    key = (raw_qname, schema.file_name, tuple(expected_kinds) if expected_kinds else None)
+    resolution = catalog.resolutions.get(key)
+    if resolution is None:
+        resolution = resolve_qname_uncached(raw_qname, schema, catalog, expected_kinds)
+        catalog.resolutions[key] = resolution
+    return resolution
+
+
+def resolve_qname_uncached(
+    raw_qname: str,
+    schema: SchemaDoc,
+    catalog: Catalog,
     expected_kinds: Optional[Sequence[str]] = None,
 ) -> QNameResolution:
     prefix, local = parse_qname(raw_qname)
     namespace = schema.target_namespace if prefix is None else schema.nsmap.get(prefix, "")
     is_builtin = namespace == BUILTIN_NS or (prefix in ("xs", "xsd") and namespace in ("", BUILTIN_NS))
 
-    matches = by_qname.get((namespace, local), [])
+    matches = catalog.by_qname.get((namespace, local), [])
     if expected_kinds:
         allowed = set(expected_kinds)
         matches = [match for match in matches if match.kind in allowed]
 
     if not matches and prefix is None:
-        local_matches: List[Component] = []
-        for (candidate_ns, candidate_name), components in by_qname.items():
-            if candidate_name != local:
-                continue
-            if expected_kinds:
-                allowed = set(expected_kinds)
-                local_matches.extend([component for component in components if component.kind in allowed])
-            else:
-                local_matches.extend(components)
+        local_matches = catalog.by_local_name.get(local, [])
+        if expected_kinds:
+            allowed = set(expected_kinds)
+            local_matches = [match for match in local_matches if match.kind in allowed]
         if len(local_matches) == 1:
             matches = local_matches
 
-    if len(matches) > 1 and schema.reachable_schema_files:
-        reachable_matches = [match for match in matches if match.schema.file_name in schema.reachable_schema_files]
+    reachable = schema.reachable_schema_files
+    if len(matches) > 1 and reachable:
+        reachable_matches = [match for match in matches if match.schema_file_name in reachable]
         if reachable_matches:
             matches = reachable_matches
 
     if len(matches) > 1:
-        same_schema = [match for match in matches if match.schema.file_name == schema.file_name]
+        file_name = schema.file_name
+        same_schema = [match for match in matches if match.schema_file_name == file_name]
         if same_schema:
             matches = same_schema
 
@@ -387,7 +590,7 @@ def resolve_qname(
     return QNameResolution(
         raw=raw_qname,
         namespace=namespace,
-        local=local,
+        local=sys.intern(local),
         is_builtin=is_builtin,
         target_ids=[component.id for component in matches],
         ambiguous=len(matches) > 1,
@@ -395,29 +598,13 @@ def resolve_qname(
     )
 
 
-def expected_kinds_for_attr(attr_name: str, owner_tag: str) -> Optional[List[str]]:
-    owner = local_name(owner_tag)
-    if attr_name in ("type", "base"):
-        return ["complexType", "simpleType"]
-    if attr_name == "itemType":
-        return ["simpleType"]
-    if attr_name == "memberTypes":
-        return ["simpleType"]
-    if attr_name == "substitutionGroup":
-        return ["element"]
+def expected_kinds_for_attr(attr_name: str, owner_tag: str) -> Optional[Tuple[str, ...]]:
     if attr_name == "ref":
-        if owner == "element":
-            return ["element"]
-        if owner == "attribute":
-            return ["attribute"]
-        if owner == "group":
-            return ["group"]
-        if owner == "attributeGroup":
-            return ["attributeGroup"]
-    return None
+        return REF_EXPECTED_KINDS.get(local_name(owner_tag))
+    return REFERENCE_EXPECTED_KINDS.get(attr_name)
 
 
-def build_context(component: Component, node: ET.Element) -> str:
+def build_context(component: Component, node: ET._Element) -> str:
     if node is component.node:
         return f"{component.kind}:{component.name}"
     tag = local_name(node.tag)
@@ -425,67 +612,52 @@ def build_context(component: Component, node: ET.Element) -> str:
     return f"{component.kind}:{component.name} > {tag}:{node_name}"
 
 
-def collect_references_for_component(
+def collect_node_references(
     component: Component,
-    by_qname: Dict[Tuple[str, str], List[Component]],
-) -> List[Reference]:
-    references: List[Reference] = []
-    dedupe: set[Tuple[str, str, str]] = set()
-
-    for node in component.node.iter():
-        for attr_name in ("type", "base", "ref", "itemType", "memberTypes", "substitutionGroup"):
-            raw = node.get(attr_name)
-            if not raw:
+    node: ET._Element,
+    references: Dict[Tuple[str, str, str], Reference],
+) -> None:
+    context = ""
+    for attr_name in REFERENCE_ATTRS:
+        raw = node.get(attr_name)
+        if not raw:
+            continue
+        if not context:
+            context = build_context(component, node)
+        expected_kinds = expected_kinds_for_attr(attr_name, node.tag)
+        values = raw.split() if attr_name == "memberTypes" else [raw]
+        for value in values:
+            key = (attr_name, value, context)
+            if key in references:
                 continue
-            values = raw.split() if attr_name == "memberTypes" else [raw]
-            for value in values:
-                expected_kinds = expected_kinds_for_attr(attr_name, node.tag)
-                resolution = resolve_qname(value, component.schema, by_qname, expected_kinds)
-                context = build_context(component, node)
-                key = (attr_name, value, context)
-                if key in dedupe:
-                    continue
-                dedupe.add(key)
-                references.append(
-                    Reference(
-                        attr_name=attr_name,
-                        raw_value=value,
-                        context=context,
-                        resolution=resolution,
-                    )
-                )
-
-    references.sort(key=lambda item: (item.attr_name, item.raw_value, item.context))
-    return references
+            references[key] = Reference(
+                attr_name=attr_name,
+                raw_value=sys.intern(value),
+                context=context,
+                expected_kinds=expected_kinds,
+            )
 
 
 def resolve_optional(
     raw_value: str,
     component: Component,
-    by_qname: Dict[Tuple[str, str], List[Component]],
+    catalog: Catalog,
     expected_kinds: Optional[Sequence[str]],
 ) -> Optional[QNameResolution]:
     if not raw_value:
         return None
-    return resolve_qname(raw_value, component.schema, by_qname, expected_kinds)
+    return resolve_qname(raw_value, component.schema, catalog, expected_kinds)
 
 
-def infer_inline_type(node: ET.Element) -> str:
-    complex_selectors = [
-        "./" + xs("complexType") + "/" + xs("complexContent") + "/" + xs("extension"),
-        "./" + xs("complexType") + "/" + xs("complexContent") + "/" + xs("restriction"),
-        "./" + xs("complexType") + "/" + xs("simpleContent") + "/" + xs("extension"),
-        "./" + xs("complexType") + "/" + xs("simpleContent") + "/" + xs("restriction"),
-    ]
-    for selector in complex_selectors:
-        candidate = node.find(selector)
-        if candidate is not None and candidate.get("base"):
-            return candidate.get("base", "")
+def infer_inline_type(node: ET._Element) -> str:
+    for base in INLINE_BASE_XPATH(node):
+        if base:
+            return str(base)
 
-    simple_type = node.find(xs("simpleType"))
+    simple_type = node.find(XS_SIMPLE_TYPE)
     if simple_type is None:
         return ""
-    restriction = simple_type.find(xs("restriction"))
+    restriction = simple_type.find(XS_RESTRICTION)
     if restriction is None:
         return ""
     return restriction.get("base", "")
@@ -495,189 +667,156 @@ def field_depth(path: str) -> int:
     return max(len([chunk for chunk in path.split("/") if chunk]) - 1, 0)
 
 
-def collect_element_fields(
-    component: Component,
-    by_qname: Dict[Tuple[str, str], List[Component]],
-) -> List[ElementField]:
-    fields: List[ElementField] = []
-    counter = 0
-
-    container_tags = {
-        "sequence",
-        "choice",
-        "all",
-        "group",
-        "complexType",
-        "complexContent",
-        "simpleContent",
-        "extension",
-        "restriction",
-    }
-
-    def walk(node: ET.Element, current_path: str) -> None:
-        nonlocal counter
-        for child in list(node):
-            tag = local_name(child.tag)
-            if tag == "element":
-                counter += 1
-                name = child.get("name") or child.get("ref") or "(anonymous)"
-                path = f"{current_path}/{name}" if current_path else name
-
-                raw_type_or_ref = child.get("ref") or child.get("type") or ""
-                if not raw_type_or_ref:
-                    raw_type_or_ref = infer_inline_type(child)
-
-                expected_kinds = ["element"] if child.get("ref") else ["complexType", "simpleType"]
-                resolution = resolve_optional(raw_type_or_ref, component, by_qname, expected_kinds)
-                docs = "; ".join(extract_documentation(child))
-                restrictions = restrictions_from_node(child)
-
-                fields.append(
-                    ElementField(
-                        id=f"{component.id}:element-field:{counter}",
-                        path=path,
-                        depth=field_depth(path),
-                        name=name,
-                        occurrence=occurrence_string(child),
-                        documentation=docs,
-                        raw_type_or_ref=raw_type_or_ref,
-                        resolution=resolution,
-                        restrictions=restrictions,
-                    )
-                )
-                walk(child, path)
-            elif tag in container_tags:
-                walk(child, current_path)
+def build_element_field(node: ET._Element, path: str) -> ElementField:
+    raw_type_or_ref = node.get("ref") or node.get("type") or ""
+    if not raw_type_or_ref:
+        raw_type_or_ref = infer_inline_type(node)
+
+    return ElementField(
+        id="",
+        path=path,
+        depth=field_depth(path),
+        name=node.get("name") or node.get("ref") or "(anonymous)",
+        occurrence=occurrence_string(node),
+        documentation="; ".join(extract_documentation(node)),
+        raw_type_or_ref=sys.intern(raw_type_or_ref),
+        expected_kinds=("element",) if node.get("ref") else ("complexType", "simpleType"),
+        restrictions=restrictions_from_node(node),
+    )
 
-    seed = component.name if component.kind in ("element", "complexType") else ""
-    walk(component.node, seed)
-    fields.sort(key=lambda item: item.path)
-    return fields
 
+def build_attribute_field(node: ET._Element, path: str) -> AttributeField:
+    raw_type_or_ref = node.get("type") or node.get("ref") or ""
+    if not raw_type_or_ref:
+        raw_type_or_ref = infer_inline_type(node)
+
+    return AttributeField(
+        id="",
+        path=path,
+        depth=field_depth(path),
+        name=node.get("name") or node.get("ref") or "(anonymous)",
+        use=node.get("use", "optional"),
+        documentation="; ".join(extract_documentation(node)),
+        raw_type_or_ref=sys.intern(raw_type_or_ref),
+        expected_kinds=("attribute",) if node.get("ref") else ("simpleType",),
+        restrictions=restrictions_from_node(node),
+    )
 
-def collect_attribute_fields(
-    component: Component,
-    by_qname: Dict[Tuple[str, str], List[Component]],
-) -> List[AttributeField]:
-    fields: List[AttributeField] = []
-    counter = 0
 
-    container_tags = {
-        "sequence",
-        "choice",
-        "all",
-        "group",
-        "complexType",
-        "complexContent",
-        "simpleContent",
-        "extension",
-        "restriction",
-    }
+def build_attribute_group_field(node: ET._Element, path: str) -> AttributeField:
+    raw_ref = node.get("ref", "")
+    return AttributeField(
+        id="",
+        path=path,
+        depth=field_depth(path),
+        name=raw_ref or "(attributeGroup)",
+        use="n/a",
+        documentation="",
+        raw_type_or_ref=sys.intern(raw_ref),
+        expected_kinds=("attributeGroup",),
+        restrictions=EMPTY_RESTRICTION,
+    )
 
-    def walk(node: ET.Element, current_path: str) -> None:
-        nonlocal counter
-        for child in list(node):
-            tag = local_name(child.tag)
-            if tag == "attribute":
-                counter += 1
-                name = child.get("name") or child.get("ref") or "(anonymous)"
-                path = f"{current_path}/@{name}" if current_path else f"@{name}"
-                raw_type_or_ref = child.get("type") or child.get("ref") or ""
-                if not raw_type_or_ref:
-                    raw_type_or_ref = infer_inline_type(child)
-                expected_kinds = ["attribute"] if child.get("ref") else ["simpleType"]
-                resolution = resolve_optional(raw_type_or_ref, component, by_qname, expected_kinds)
-                docs = "; ".join(extract_documentation(child))
-                restrictions = restrictions_from_node(child)
-
-                fields.append(
-                    AttributeField(
-                        id=f"{component.id}:attribute-field:{counter}",
-                        path=path,
-                        depth=field_depth(path),
-                        name=name,
-                        use=child.get("use", "optional"),
-                        documentation=docs,
-                        raw_type_or_ref=raw_type_or_ref,
-                        resolution=resolution,
-                        restrictions=restrictions,
-                    )
-                )
-                walk(child, current_path)
-            elif tag == "attributeGroup":
-                counter += 1
-                raw_ref = child.get("ref", "")
-                path = f"{current_path}/@group:{raw_ref}" if current_path else f"@group:{raw_ref}"
-                resolution = resolve_optional(raw_ref, component, by_qname, ["attributeGroup"])
-                fields.append(
-                    AttributeField(
-                        id=f"{component.id}:attribute-field:{counter}",
-                        path=path,
-                        depth=field_depth(path),
-                        name=raw_ref or "(attributeGroup)",
-                        use="n/a",
-                        documentation="",
-                        raw_type_or_ref=raw_ref,
-                        resolution=resolution,
-                        restrictions={"base": "", "enumerations": [], "facets": {}},
-                    )
-                )
-                walk(child, current_path)
-            elif tag in container_tags:
-                walk(child, current_path)
 
+def analyze_component(component: Component) -> ComponentAnalysis:
+    element_fields: List[ElementField] = []
+    attribute_fields: List[AttributeField] = []
+    references: Dict[Tuple[str, str, str], Reference] = {}
+    enumerations: Dict[str, None] = {}
     seed = component.name if component.kind in ("element", "complexType") else ""
-    walk(component.node, seed)
-    fields.sort(key=lambda item: item.path)
-    return fields
-
-
-def collect_enum_values(component: Component) -> List[str]:
-    values: List[str] = []
-    for enum in component.node.findall(".//" + xs("enumeration")):
-        value = enum.get("value")
-        if value is not None:
-            values.append(value)
-    deduped: List[str] = []
-    seen = set()
-    for value in values:
-        if value in seen:
+
+    # One frame per open node: the path nested element fields are reported
+    # under (None when elements below are not collected) and whether
+    # attributes below are collected. Attribute paths never nest.
+    stack: List[Tuple[Optional[str], bool]] = []
+    for event, node in ET.iterwalk(component.node, events=("start", "end")):
+        if event == "end":
+            stack.pop()
+            continue
+        if not REFERENCE_ATTR_NAMES.isdisjoint(node.keys()):
+            collect_node_references(component, node, references)
+        if not stack:
+            stack.append((seed, True))
             continue
-        seen.add(value)
-        deduped.append(value)
-    return deduped
 
+        tag = node.tag
+        if tag == XS_ENUMERATION:
+            value = node.get("value")
+            if value is not None:
+                enumerations[value] = None
+
+        element_path, collect_attributes = stack[-1]
+        child_element_path: Optional[str] = None
+        child_collect_attributes = False
+
+        if element_path is not None:
+            if tag == XS_ELEMENT:
+                name = node.get("name") or node.get("ref") or "(anonymous)"
+                child_element_path = f"{element_path}/{name}" if element_path else name
+                element_fields.append(build_element_field(node, child_element_path))
+            elif tag in CONTAINER_TAGS:
+                child_element_path = element_path
+
+        if collect_attributes:
+            if tag == XS_ATTRIBUTE:
+                name = node.get("name") or node.get("ref") or "(anonymous)"
+                path = f"{seed}/@{name}" if seed else f"@{name}"
+                attribute_fields.append(build_attribute_field(node, path))
+                child_collect_attributes = True
+            elif tag == XS_ATTRIBUTE_GROUP:
+                raw_ref = node.get("ref", "")
+                path = f"{seed}/@group:{raw_ref}" if seed else f"@group:{raw_ref}"
+                attribute_fields.append(build_attribute_group_field(node, path))
+                child_collect_attributes = True
+            elif tag in CONTAINER_TAGS:
+                child_collect_attributes = True
+
+        stack.append((child_element_path, child_collect_attributes))
+
+    return ComponentAnalysis(
+        restrictions=restrictions_from_node(component.node),
+        enumerations=list(enumerations),
+        base_type=collect_base_type(component),
+        element_fields=element_fields,
+        attribute_fields=attribute_fields,
+        references=[references[key] for key in sorted(references)],
+    )
 
-def collect_base_type(
-    component: Component,
-    by_qname: Dict[Tuple[str, str], List[Component]],
-) -> Optional[BaseType]:
-    namespace = {"xs": XS_NS}
-
-    selectors = [
-        "./xs:complexContent/xs:extension",
-        "./xs:complexContent/xs:restriction",
-        "./xs:simpleContent/xs:extension",
-        "./xs:simpleContent/xs:restriction",
-        "./xs:restriction",
-        "./xs:simpleType/xs:restriction",
-    ]
 
-    raw = ""
-    for selector in selectors:
-        node = component.node.find(selector, namespace)
-        if node is not None and node.get("base"):
-            raw = node.get("base", "")
-            break
+def collect_base_type(component: Component) -> Optional[BaseType]:
+    for base in BASE_TYPE_XPATH(component.node):
+        if base:
+            return BaseType(raw=sys.intern(str(base)))
+    return None
 
-    if not raw:
-        return None
 
-    resolution = resolve_qname(raw, component.schema, by_qname, ["complexType", "simpleType"])
-    return BaseType(raw=raw, resolution=resolution)
+def resolve_component(component: Component, analysis: ComponentAnalysis, catalog: Catalog) -> None:
+    for counter, field in enumerate(analysis.element_fields, start=1):
+        field.id = f"{component.id}:element-field:{counter}"
+        field.resolution = resolve_optional(field.raw_type_or_ref, component, catalog, field.expected_kinds)
+    for counter, field in enumerate(analysis.attribute_fields, start=1):
+        field.id = f"{component.id}:attribute-field:{counter}"
+        field.resolution = resolve_optional(field.raw_type_or_ref, component, catalog, field.expected_kinds)
+    for reference in analysis.references:
+        reference.resolution = resolve_qname(reference.raw_value, component.schema, catalog, reference.expected_kinds)
+    if analysis.base_type is not None:
+        analysis.base_type.resolution = resolve_qname(
+            analysis.base_type.raw, component.schema, catalog, ["complexType", "simpleType"]
+        )
+
+    component.restrictions = analysis.restrictions
+    component.enumerations = analysis.enumerations
+    component.base_type = analysis.base_type
+    component.element_fields = sorted(analysis.element_fields, key=attrgetter("path"))
+    component.attribute_fields = sorted(analysis.attribute_fields, key=attrgetter("path"))
+    component.references = analysis.references
 
 
 def to_restriction_json(raw: Dict[str, object]) -> Dict[str, object]:
+    # Compared by value: restrictions loaded from the parse cache or a
+    # worker process are unpickled copies, not the shared instance.
+    if raw == EMPTY_RESTRICTION:
+        return EMPTY_RESTRICTION_JSON
     return {
         "base": str(raw.get("base") or ""),
         "enumerations": [str(value) for value in raw.get("enumerations", [])],
@@ -754,6 +893,8 @@ def component_to_json(component: Component) -> Dict[str, object]:
 
 
 def resolution_to_json(resolution: QNameResolution) -> Dict[str, object]:
+    if resolution.payload is not None:
+        return resolution.payload
     payload: Dict[str, object] = {
         "raw": resolution.raw,
         "namespace": resolution.namespace,
@@ -764,6 +905,7 @@ def resolution_to_json(resolution: QNameResolution) -> Dict[str, object]:
     }
     if resolution.unresolved_reason:
         payload["unresolvedReason"] = resolution.unresolved_reason
+    resolution.payload = payload
     return payload
 
 
@@ -789,23 +931,158 @@ def schema_to_json(schema: SchemaDoc) -> Dict[str, object]:
     }
 
 
-def parse_all_schemas(input_dir: Path) -> List[SchemaDoc]:
-    schemas: List[SchemaDoc] = []
-    for path in sorted(input_dir.glob("*.xsd")):
-        schemas.append(parse_schema(path))
-    return schemas
+def iter_xsd_files(input_dir: Path) -> Iterator[Path]:
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".xsd") and entry.is_file():
+                yield Path(entry.path)
+
+
+def script_digest() -> str:
+    return file_digest(Path(__file__))
+
 
+def load_parse_cache(cache_path: Path) -> ParseCache:
+    try:
+        with cache_path.open("rb") as handle:
+            version, source_digest, entries, digests = pickle.load(handle)
+    except Exception:
+        # The cache is disposable: a missing, truncated or garbled file
+        # (which pickle can report as almost any error) just starts over.
+        return ParseCache()
+    if version != CACHE_VERSION or source_digest != script_digest():
+        return ParseCache()
+    return ParseCache(entries=entries, digests=digests)
 
-def create_index(input_dir: Path) -> Dict[str, object]:
-    schemas = parse_all_schemas(input_dir)
+
+def save_parse_cache(cache_path: Path, cache: ParseCache) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    with tmp_path.open("wb") as handle:
+        pickle.dump(
+            (CACHE_VERSION, script_digest(), cache.entries, cache.digests),
+            handle,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, cache_path)
+
+
+def cached_file_digest(path: Path, cache: ParseCache) -> Tuple[int, int, str]:
+    # Like make, trust an unchanged mtime and size instead of rereading the
+    # file; only files that were touched since the last run are hashed.
+    stat = path.stat()
+    known = cache.digests.get(str(path))
+    if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        return known
+    return stat.st_mtime_ns, stat.st_size, file_digest(path)
+
+
+def relocate_schema(schema: SchemaDoc, xsd_path: Path) -> None:
+    # Cache entries are keyed by content only, so anything derived from the
+    # file's name or its siblings is recomputed for the current location.
+    schema.path = xsd_path
+    schema.file_name = xsd_path.name
+    schema.id = f"schema-{slugify(xsd_path.stem)}"
+    schema_dir = str(xsd_path.parent)
+    for dependency in schema.dependencies:
+        if dependency.location and "://" not in dependency.location:
+            dependency.resolved_file_name, dependency.exists = resolve_schema_location(
+                schema_dir, dependency.location
+            )
+
+
+def load_all_schemas(
+    input_dir: Path,
+    jobs: int = 1,
+    cache_path: Optional[Path] = None,
+) -> List[Tuple[SchemaDoc, List[ComponentAnalysis]]]:
+    # Dependency targets may have appeared or disappeared since an earlier
+    # build in this process; only memoize within one build.
+    resolve_schema_location.cache_clear()
+    paths = sorted(iter_xsd_files(input_dir))
+    cache = load_parse_cache(cache_path) if cache_path else ParseCache()
+    file_digests = [cached_file_digest(path, cache) for path in paths] if cache_path else []
+    digests = [digest for _, _, digest in file_digests]
+
+    loaded: List[Optional[Tuple[SchemaDoc, List[ComponentAnalysis]]]] = [None] * len(paths)
+    missing: List[int] = []
+    for position, path in enumerate(paths):
+        cached = cache.entries.get(digests[position]) if digests else None
+        if cached is None:
+            missing.append(position)
+            continue
+        try:
+            schema, analyses = pickle.loads(cached)
+        except Exception:
+            # Pickled under a different module name (run as a script vs
+            # imported as a package) or corrupted; treat it as a miss.
+            del cache.entries[digests[position]]
+            missing.append(position)
+            continue
+        relocate_schema(schema, path)
+        loaded[position] = (schema, analyses)
+
+    missing_paths = [paths[position] for position in missing]
+    if jobs == 1 or len(missing_paths) <= 1:
+        parsed = [parse_schema(path) for path in missing_paths]
+    else:
+        workers = jobs or os.cpu_count() or 1
+        chunksize = max(1, len(missing_paths) // (workers * 4))
+        # Imported here: pulling in multiprocessing costs ~25ms of startup
+        # that serial and up-to-date --incremental runs never need.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(parse_schema, missing_paths, chunksize=chunksize))
+    for position, result in zip(missing, parsed):
+        loaded[position] = result
+
+    if cache_path:
+        # Only entries for files seen in this run are kept, so the cache
+        # never outgrows the input directory.
+        updated = ParseCache(digests={str(path): known for path, known in zip(paths, file_digests)})
+        for digest, result in zip(digests, loaded):
+            if digest not in updated.entries:
+                updated.entries[digest] = cache.entries.get(digest) or pickle.dumps(
+                    result, protocol=pickle.HIGHEST_PROTOCOL
+                )
+        if updated != cache:
+            save_parse_cache(cache_path, updated)
+    return loaded
+
+
+def build_label_path_index(components: Iterable[Component]) -> Dict[str, List[str]]:
+    # Element field path (e.g. "Order/Lines/Line") -> ids of the components
+    # declaring it, so the explorer can look a path up without scanning.
+    label_paths: Dict[str, List[str]] = defaultdict(list)
+    for component in components:
+        for field in component.element_fields:
+            component_ids = label_paths[field.path]
+            if not component_ids or component_ids[-1] != component.id:
+                component_ids.append(component.id)
+    return {path: label_paths[path] for path in sorted(label_paths)}
+
+
+def create_index(
+    input_dir: Path,
+    jobs: int = 1,
+    cache_path: Optional[Path] = None,
+) -> Dict[str, object]:
+    # Resolved once here; every schema path is derived from it by scandir,
+    # so nothing downstream needs to resolve per file.
+    input_dir = input_dir.resolve()
+    loaded = load_all_schemas(input_dir, jobs, cache_path)
+    schemas = [schema for schema, _ in loaded]
+    analyses = [schema_analyses for _, schema_analyses in loaded]
     assign_component_ids(schemas)
     compute_reachable_schemas(schemas)
-    by_qname = build_catalog(schemas)
+    catalog = build_catalog(schemas)
 
     warnings: List[Dict[str, object]] = []
 
     components_by_id: Dict[str, Component] = {}
-    for schema in schemas:
+    root_element_count = 0
+    for schema_index, schema in enumerate(schemas):
         for dep in schema.dependencies:
             if dep.location and not dep.exists:
                 warnings.append(
@@ -820,14 +1097,11 @@ def create_index(input_dir: Path) -> Dict[str, object]:
                     }
                 )
 
-        for component in schema.components:
+        for component, analysis in zip(schema.components, analyses[schema_index]):
             components_by_id[component.id] = component
-            component.restrictions = restrictions_from_node(component.node)
-            component.enumerations = collect_enum_values(component)
-            component.base_type = collect_base_type(component, by_qname)
-            component.element_fields = collect_element_fields(component, by_qname)
-            component.attribute_fields = collect_attribute_fields(component, by_qname)
-            component.references = collect_references_for_component(component, by_qname)
+            if component.kind == "element":
+                root_element_count += 1
+            resolve_component(component, analysis, catalog)
 
     incoming_dedupe: set[Tuple[str, str, str, str]] = set()
     for component in components_by_id.values():
@@ -866,19 +1140,15 @@ def create_index(input_dir: Path) -> Dict[str, object]:
                 )
 
     for component in components_by_id.values():
-        component.incoming.sort(key=lambda item: (item.source_id, item.attr_name, item.raw_value, item.context))
-
-    schemas_sorted = sorted(schemas, key=lambda schema: schema.file_name)
-    components_sorted = sorted(
-        components_by_id.values(), key=lambda component: (component.schema.file_name, component.kind, component.name, component.id)
-    )
+        component.incoming.sort(key=attrgetter("source_id", "attr_name", "raw_value", "context"))
 
-    root_element_count = sum(len([c for c in schema.components if c.kind == "element"]) for schema in schemas_sorted)
+    schemas_sorted = sorted(schemas, key=attrgetter("file_name"))
+    components_sorted = sorted(components_by_id.values(), key=attrgetter("schema_file_name", "kind", "name", "id"))
 
     return {
         "version": 1,
         "generatedAt": datetime.now(timezone.utc).isoformat(),
-        "sourceDirectory": str(input_dir.resolve()),
+        "sourceDirectory": str(input_dir),
         "summary": {
             "schemaCount": len(schemas_sorted),
             "componentCount": len(components_sorted),
@@ -887,14 +1157,134 @@ def create_index(input_dir: Path) -> Dict[str, object]:
         },
         "warnings": warnings,
         "schemas": [schema_to_json(schema) for schema in schemas_sorted],
-        "components": [component_to_json(component) for component in components_sorted],
+        "labelPathIndex": build_label_path_index(components_sorted),
+        # Encoded lazily by write_index so the component payloads are never
+        # all held in memory at once.
+        "components": (component_to_json(component) for component in components_sorted),
     }
 
 
-def write_index(index_data: Dict[str, object], output_path: Path) -> None:
+def encode_json(value: object, pretty: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_index(
+    index_data: Dict[str, object],
+    output_path: Path,
+    pretty: bool = False,
+    compress: bool = False,
+) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
-        json.dump(index_data, handle, indent=2)
+    # Write beside the target and swap it in, so an interrupted run never
+    # leaves a truncated index behind for the app to load.
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+    try:
+        with tmp_path.open("wb", buffering=WRITE_BUFFER_SIZE) as handle:
+            write_index_json(index_data, handle, pretty)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, output_path)
+
+    gzip_path = output_path.with_name(f"{output_path.name}.gz")
+    if compress:
+        write_gzip_copy(output_path, gzip_path)
+    else:
+        # A host serving precompressed files would otherwise keep handing
+        # out the previous build.
+        gzip_path.unlink(missing_ok=True)
+
+
+def write_gzip_copy(source_path: Path, gzip_path: Path) -> None:
+    tmp_path = gzip_path.with_name(f"{gzip_path.name}.tmp")
+    try:
+        with source_path.open("rb") as source, tmp_path.open("wb") as raw:
+            # mtime=0 keeps the archive byte-identical for identical input.
+            with gzip.GzipFile(filename=source_path.name, mode="wb", fileobj=raw, compresslevel=6, mtime=0) as target:
+                shutil.copyfileobj(source, target, WRITE_BUFFER_SIZE)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, gzip_path)
+
+
+def write_index_json(index_data: Dict[str, object], handle: BinaryIO, pretty: bool) -> None:
+    header = {key: value for key, value in index_data.items() if key != "components"}
+    if not pretty:
+        handle.write(encode_json(header)[:-1])
+        handle.write(b',"components":[')
+        separator = b""
+        for component in index_data["components"]:
+            handle.write(separator)
+            handle.write(encode_json(component))
+            separator = b","
+        handle.write(b"]}")
+        return
+
+    handle.write(encode_json(header, pretty=True)[: -len(b"\n}")])
+    handle.write(b',\n  "components": [')
+    empty = True
+    for component in index_data["components"]:
+        handle.write(b"\n    " if empty else b",\n    ")
+        empty = False
+        # Encoded strings never contain a raw newline, so every newline
+        # is indentation and can be shifted two levels deeper.
+        handle.write(encode_json(component, pretty=True).replace(b"\n", b"\n    "))
+    handle.write(b"]\n}" if empty else b"\n  ]\n}")
+
+
+def stat_key(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def build_stamp(input_dir: Path, output_path: Path, pretty: bool, compress: bool) -> Dict[str, object]:
+    return {
+        "version": CACHE_VERSION,
+        "script": stat_key(Path(__file__)),
+        "input": str(input_dir),
+        "files": {path.name: stat_key(path) for path in sorted(iter_xsd_files(input_dir))},
+        "output": str(output_path),
+        "pretty": pretty,
+        "gzip": compress,
+    }
+
+
+def output_stats(output_path: Path, compress: bool) -> Optional[List[List[int]]]:
+    paths = [output_path]
+    if compress:
+        paths.append(output_path.with_name(f"{output_path.name}.gz"))
+    # A missing output (or .gz copy) never matches a stamp, so it forces a rebuild.
+    if not all(path.exists() for path in paths):
+        return None
+    return [stat_key(path) for path in paths]
+
+
+def read_stamp(stamp_path: Path) -> Optional[Dict[str, object]]:
+    try:
+        with stamp_path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_stamp(stamp_path: Path, stamp: Dict[str, object]) -> None:
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = stamp_path.with_name(f"{stamp_path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(stamp, handle)
+    os.replace(tmp_path, stamp_path)
+
+
+def job_count(value: str) -> int:
+    jobs = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater, got {jobs}")
+    return jobs
 
 
 def parse_args() -> argparse.Namespace:
@@ -905,6 +1295,33 @@ def parse_args() -> argparse.Namespace:
         default="public/data/xsd-index.json",
         help="Output JSON path",
     )
+    parser.add_argument(
+        "--jobs",
+        type=job_count,
+        default=1,
+        help="Worker processes for parsing and analysis (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--cache",
+        default=".cache/xsd-parse-cache.pickle",
+        help="Parse cache path, keyed by file content",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every file without reading or writing the cache",
+    )
+    parser.add_argument("--pretty", action="store_true", help="Indent the output JSON for reading")
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Also write a gzip-compressed copy next to the output (<output>.gz)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip the rebuild when no input file changed since the last run",
+    )
     return parser.parse_args()
 
 
@@ -916,8 +1333,26 @@ def main() -> None:
     if not input_dir.exists() or not input_dir.is_dir():
         raise SystemExit(f"Input directory does not exist: {input_dir}")
 
-    index_data = create_index(input_dir)
-    write_index(index_data, output_path)
+    cache_path = None if args.no_cache else Path(args.cache).resolve()
+    if args.incremental and cache_path is None:
+        raise SystemExit("--incremental needs the parse cache; drop --no-cache")
+
+    # The stamp records the input files' mtime and size as of this build,
+    # plus the output it produced. Taking it before parsing means an edit
+    # made mid-build still triggers the next incremental run.
+    stamp_path = cache_path.with_name(f"{cache_path.stem}.stamp.json") if cache_path else None
+    stamp = build_stamp(input_dir, output_path, args.pretty, args.gzip) if stamp_path else None
+    if args.incremental:
+        current = output_stats(output_path, args.gzip)
+        previous = read_stamp(stamp_path)
+        if current is not None and previous == {**stamp, "outputStat": current}:
+            print(f"No input changes since the last build; {output_path} is up to date")
+            return
+
+    index_data = create_index(input_dir, jobs=args.jobs, cache_path=cache_path)
+    write_index(index_data, output_path, pretty=args.pretty, compress=args.gzip)
+    if stamp_path:
+        write_stamp(stamp_path, {**stamp, "outputStat": output_stats(output_path, args.gzip)})
     print(
         f"Wrote {index_data['summary']['componentCount']} components from "
         f"{index_data['summary']['schemaCount']} schemas to {output_path}"